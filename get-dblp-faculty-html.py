@@ -1,19 +1,125 @@
-import requests
+import aiohttp
+import asyncio
 import csv
-import time
 import logging
+import queue
+import random
+import sqlite3
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from urllib.parse import urlparse
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('faculty_scraper.log'),
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (compatible; Academic Research Bot; +https://example.org/bot)'
+}
+
+# Concurrency limits for downloading DBLP pages. Every page is on dblp.org, so the
+# semaphore matches the per-host limit and a request holding it never waits for a connection.
+MAX_CONNECTIONS = 16
+MAX_CONNECTIONS_PER_HOST = 4
+MAX_CONCURRENT_REQUESTS = MAX_CONNECTIONS_PER_HOST
+
+# Per-connect and per-read timeouts (seconds), with no cap on the whole request
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 10
+
+# Used to build file names from DBLP URLs without parsing every URL
+DBLP_URL_PREFIXES = ('https://dblp.org/', 'http://dblp.org/')
+SLASH_TO_UNDERSCORE = str.maketrans('/', '_')
+
+# Persistent record of URLs that could not be downloaded, and how long to trust it.
+# Pages that do not exist (404/410) are skipped for a week; transient failures such as
+# timeouts, 408, 403, 5xx or repeated 429s (stored with a NULL status) only for an hour.
+PERMANENT_FAILURE_STATUSES = (404, 410)
+FAILURE_DB = 'dblp_failures.db'
+FAILURE_TTL_SECONDS = 7 * 24 * 60 * 60
+TRANSIENT_FAILURE_TTL_SECONDS = 60 * 60
+
+
+class PermanentFetchError(Exception):
+    """Raised when DBLP reports that a page does not exist, which will not change on retry."""
+
+    def __init__(self, url, status):
+        super().__init__(f"{url} returned {status}")
+        self.status = status
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=30.0):
+    """Return a full-jitter exponential backoff delay for the given attempt."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def retry_after_delay(retry_after, attempt, max_delay=60.0):
+    """
+    Return how long to wait after a 429 response.
+    Honors a Retry-After header given in seconds or as an HTTP date, capped at max_delay,
+    otherwise falls back to backoff_delay.
+    """
+    if retry_after:
+        retry_after = retry_after.strip()
+        if retry_after.isdigit():
+            return min(float(retry_after), max_delay)
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            retry_at = None
+        if retry_at is not None and retry_at.tzinfo is not None:
+            return min(max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds()), max_delay)
+    return backoff_delay(attempt)
+
+
+def setup_logging(log_file='faculty_scraper.log'):
+    """
+    Configure logging with both file and console handlers.
+    Records are queued and written by a background QueueListener so the download
+    loop never blocks on log I/O. Returns the listener, which must be stopped on exit.
+    """
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.FileHandler(log_file),
         logging.StreamHandler()
     ]
-)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+    logging.basicConfig(level=logging.INFO, format='%(message)s', handlers=[QueueHandler(log_queue)])
+
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    return listener
+
+
+def open_failure_db(db_path=FAILURE_DB):
+    """Open the sqlite failure cache, creating its table if needed."""
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE IF NOT EXISTS fails (url TEXT PRIMARY KEY, status INTEGER, ts INTEGER)')
+    return conn
+
+
+def load_recent_failures(conn):
+    """
+    Return the set of URLs that should still be skipped: missing pages (404/410) recorded
+    within FAILURE_TTL_SECONDS and any other failure within TRANSIENT_FAILURE_TTL_SECONDS.
+    """
+    now = int(time.time())
+    rows = conn.execute(
+        'SELECT url FROM fails WHERE ts >= ? OR (status IN (?, ?) AND ts >= ?)',
+        (now - TRANSIENT_FAILURE_TTL_SECONDS, *PERMANENT_FAILURE_STATUSES, now - FAILURE_TTL_SECONDS)
+    )
+    return {url for (url,) in rows}
+
+
+def record_failure(conn, url, status=None):
+    """Remember that url could not be downloaded; status is None if no response was usable."""
+    conn.execute(
+        'INSERT OR REPLACE INTO fails (url, status, ts) VALUES (?, ?, ?)',
+        (url, status, int(time.time()))
+    )
+    conn.commit()
 
 
 def setup_directories():
@@ -29,37 +135,73 @@ def setup_directories():
     return True
 
 
-def get_dblp_page(url, retry_delay=5, max_retries=3):
+async def fetch(session, url, max_retries=3):
     """
-    Download a DBLP page with rate limiting and retries.
+    Download a DBLP page with rate limiting and retries, returning the raw response body.
+    Raises PermanentFetchError for 404/410, which are not retried; other errors are retried.
     """
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (compatible; Academic Research Bot; +https://example.org/bot)'
-    }
-
     for attempt in range(max_retries):
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            async with session.get(url) as response:
+                if response.status == 429:  # Too Many Requests
+                    if attempt < max_retries - 1:
+                        delay = retry_after_delay(response.headers.get('Retry-After'), attempt)
+                        logging.warning(f"Rate limit hit. Waiting {delay:.1f} seconds...")
+                        await asyncio.sleep(delay)
+                    else:
+                        logging.warning(f"Rate limit hit on final attempt for {url}")
+                    continue
 
-            if response.status_code == 429:  # Too Many Requests
-                logging.warning(f"Rate limit hit. Waiting {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                continue
+                if response.status in PERMANENT_FAILURE_STATUSES:
+                    raise PermanentFetchError(url, response.status)
 
-            response.raise_for_status()
-            return response.text
+                response.raise_for_status()
+                return await response.read()
 
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error downloading {url} (attempt {attempt + 1}/{max_retries}): {e}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.error(f"Error downloading {url} (attempt {attempt + 1}/{max_retries}): {e!r}")
             if attempt < max_retries - 1:
-                time.sleep(retry_delay)
+                await asyncio.sleep(backoff_delay(attempt))
 
     return None
 
 
-def process_faculty_file(csv_path, faculty_html_dir):
+def get_page_stem(dblp_url):
+    """
+    Create a safe file name (without extension) from a DBLP URL.
+    Plain dblp.org URLs are sliced directly; anything else goes through urlparse.
+    """
+    if dblp_url.startswith(DBLP_URL_PREFIXES) and '?' not in dblp_url and '#' not in dblp_url:
+        path = dblp_url.split('dblp.org', 1)[1]
+    else:
+        path = urlparse(dblp_url).path
+    return path.translate(SLASH_TO_UNDERSCORE).strip('_')
+
+
+async def bounded_fetch(sem, session, url, output_path, failure_db):
+    """
+    Download a single DBLP page while holding the semaphore and save it to output_path.
+    Missing pages and exhausted retries are recorded in failure_db so later runs skip the URL.
+    """
+    async with sem:
+        logging.info(f"Downloading {url}")
+        try:
+            html_content = await fetch(session, url)
+        except PermanentFetchError as e:
+            logging.warning(f"Giving up on {e}")
+            record_failure(failure_db, url, e.status)
+            return
+
+    if html_content:
+        output_path.write_bytes(html_content)
+    else:
+        record_failure(failure_db, url)
+
+
+async def process_faculty_file(sem, session, csv_path, faculty_html_dir, failure_db, recent_failures):
     """
-    Process a single faculty CSV file and download DBLP pages.
+    Process a single faculty CSV file and download DBLP pages concurrently.
+    URLs in recent_failures are skipped.
     """
     university_name = csv_path.stem.replace('_faculty', '')
     logging.info(f"Processing faculty from: {university_name}")
@@ -68,61 +210,105 @@ def process_faculty_file(csv_path, faculty_html_dir):
     univ_dir = faculty_html_dir / university_name
     univ_dir.mkdir(exist_ok=True)
 
+    # List the directory once so skip checks are set lookups rather than a stat per row
+    existing = {path.name for path in univ_dir.iterdir()}
+
     try:
+        pending = []
+        downloaded = 0
+        failed = 0
         with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                logging.info(f"No faculty listed in {csv_path}")
+                return
+            if 'author' not in header:
+                logging.error(f"No 'author' column in {csv_path}")
+                return
+            author_index = header.index('author')
             for row in reader:
-                dblp_url = row['author'].strip()
+                if len(row) <= author_index:
+                    continue
+                dblp_url = row[author_index].strip()
                 if not dblp_url:
                     continue
 
-                # Create a safe filename from the DBLP URL
-                parsed_url = urlparse(dblp_url)
-                safe_filename = parsed_url.path.replace('/', '_').strip('_') + '.html'
-                output_path = univ_dir / safe_filename
+                safe_filename = get_page_stem(dblp_url) + '.html'
+
+                # Skip if already downloaded or queued
+                if safe_filename in existing:
+                    downloaded += 1
+                    continue
 
-                # Skip if already downloaded
-                if output_path.exists():
-                    logging.info(f"Skipping {dblp_url} - already downloaded")
+                # Skip if a recent run failed to download the page
+                if dblp_url in recent_failures:
+                    failed += 1
                     continue
 
-                logging.info(f"Downloading {dblp_url}")
-                html_content = get_dblp_page(dblp_url)
+                # Mark as taken so a repeated URL in the same CSV is not fetched twice
+                existing.add(safe_filename)
+                pending.append((dblp_url, univ_dir / safe_filename))
 
-                if html_content:
-                    output_path.write_text(html_content, encoding='utf-8')
-                    time.sleep(1)  # Rate limiting between requests
+        logging.info(
+            f"Skipping {downloaded} already downloaded and {failed} recently failed, "
+            f"fetching {len(pending)} from {university_name}"
+        )
+        await asyncio.gather(*[
+            bounded_fetch(sem, session, url, path, failure_db) for url, path in pending
+        ])
 
     except Exception as e:
         logging.error(f"Error processing {csv_path}: {e}")
 
 
+async def download_faculty_pages(csv_files, faculty_html_dir):
+    """
+    Download DBLP pages for every faculty CSV file over a shared connection pool.
+    """
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, limit_per_host=MAX_CONNECTIONS_PER_HOST)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT)
+
+    failure_db = open_failure_db()
+    try:
+        recent_failures = load_recent_failures(failure_db)
+        async with aiohttp.ClientSession(connector=connector, headers=HEADERS, timeout=timeout) as session:
+            for csv_file in csv_files:
+                await process_faculty_file(
+                    sem, session, csv_file, faculty_html_dir, failure_db, recent_failures
+                )
+    finally:
+        failure_db.close()
+
+
 def main():
     """
     Main function to coordinate the downloading of faculty DBLP pages.
     """
-    if not setup_directories():
-        return
+    listener = setup_logging()
+    try:
+        if not setup_directories():
+            return
 
-    faculty_data_dir = Path('faculty_data')
-    faculty_html_dir = Path('faculty_html')
+        faculty_data_dir = Path('faculty_data')
+        faculty_html_dir = Path('faculty_html')
 
-    # Process each CSV file in the faculty_data directory
-    csv_files = list(faculty_data_dir.glob('*_faculty.csv'))
+        # Process each CSV file in the faculty_data directory
+        csv_files = list(faculty_data_dir.glob('*_faculty.csv'))
 
-    if not csv_files:
-        logging.error("No faculty CSV files found in faculty_data directory")
-        return
+        if not csv_files:
+            logging.error("No faculty CSV files found in faculty_data directory")
+            return
 
-    logging.info(f"Found {len(csv_files)} faculty CSV files to process")
+        logging.info(f"Found {len(csv_files)} faculty CSV files to process")
 
-    for csv_file in csv_files:
-        process_faculty_file(csv_file, faculty_html_dir)
-        time.sleep(2)  # Add delay between processing different universities
+        asyncio.run(download_faculty_pages(csv_files, faculty_html_dir))
 
-    logging.info("Completed downloading faculty DBLP pages")
+        logging.info("Completed downloading faculty DBLP pages")
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
     main()
-    main()
\ No newline at end of file
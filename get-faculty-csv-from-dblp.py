@@ -1,7 +1,30 @@
+import hashlib
+import io
 import requests
 import pandas as pd
+import random
 import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from requests.adapters import HTTPAdapter
+
+SPARQL_ENDPOINT = "https://sparql.dblp.org/sparql"
+
+# Shared session so every query reuses the same keep-alive connection
+SESSION = requests.Session()
+SESSION.headers.update({
+    'Accept': 'text/csv',
+    'Content-Type': 'application/sparql-query'
+})
+SESSION.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+# Number of universities requested per SPARQL query
+UNIVERSITIES_PER_QUERY = 50
+
+# On-disk cache of SPARQL results, keyed by a hash of the query text
+CACHE_DIR = Path('cache') / 'sparql'
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
 
 
 def normalize_university_name(name):
@@ -9,21 +32,43 @@ def normalize_university_name(name):
     return name.strip().lower()
 
 
-def query_dblp_sparql(query, retry_delay=5, max_retries=3):
-    """Execute a SPARQL query against the DBLP endpoint with rate limiting."""
-    endpoint = "https://sparql.dblp.org/sparql"
-    headers = {
-        'Accept': 'text/csv',
-        'Content-Type': 'application/sparql-query'
-    }
+def backoff_delay(attempt, base_delay=1.0, max_delay=30.0):
+    """Return a full-jitter exponential backoff delay for the given attempt."""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def retry_after_delay(retry_after, attempt, max_delay=60.0):
+    """
+    Return how long to wait after a 429 response.
+    Honors a Retry-After header given in seconds or as an HTTP date, capped at max_delay,
+    otherwise falls back to backoff_delay.
+    """
+    if retry_after:
+        retry_after = retry_after.strip()
+        if retry_after.isdigit():
+            return min(float(retry_after), max_delay)
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            retry_at = None
+        if retry_at is not None and retry_at.tzinfo is not None:
+            return min(max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds()), max_delay)
+    return backoff_delay(attempt)
+
 
+def query_dblp_sparql(query, max_retries=3):
+    """Execute a SPARQL query against the DBLP endpoint with rate limiting."""
     for attempt in range(max_retries):
         try:
-            response = requests.post(endpoint, headers=headers, data=query)
+            response = SESSION.post(SPARQL_ENDPOINT, data=query)
 
             if response.status_code == 429:  # Too Many Requests
-                print(f"Rate limit hit. Waiting {retry_delay} seconds...")
-                time.sleep(retry_delay)
+                if attempt < max_retries - 1:
+                    delay = retry_after_delay(response.headers.get('Retry-After'), attempt)
+                    print(f"Rate limit hit. Waiting {delay:.1f} seconds...")
+                    time.sleep(delay)
+                else:
+                    print("Rate limit hit on final attempt")
                 continue
 
             response.raise_for_status()
@@ -32,44 +77,103 @@ def query_dblp_sparql(query, retry_delay=5, max_retries=3):
         except requests.exceptions.RequestException as e:
             print(f"Error making request (attempt {attempt + 1}/{max_retries}): {e}")
             if attempt < max_retries - 1:
-                time.sleep(retry_delay)
+                time.sleep(backoff_delay(attempt))
+
+    return None
 
+
+def get_cache_path(query):
+    """Return the cache file path for a SPARQL query."""
+    return CACHE_DIR / f"{hashlib.sha256(query.encode('utf-8')).hexdigest()}.csv"
+
+
+def read_cached_results(query):
+    """Return cached results for a SPARQL query, or None if missing or expired."""
+    cache_path = get_cache_path(query)
+    try:
+        if time.time() - cache_path.stat().st_mtime < CACHE_TTL_SECONDS:
+            return cache_path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        pass
     return None
 
 
-def get_faculty_query(university):
-    """Generate SPARQL query for a given university."""
+def write_cached_results(query, results):
+    """Store the results of a SPARQL query in the cache."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    get_cache_path(query).write_text(results, encoding='utf-8')
+
+
+def escape_sparql_string(value):
+    """Escape a value for use inside a double-quoted SPARQL string literal."""
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def get_faculty_query(universities):
+    """Generate a single SPARQL query covering a batch of universities."""
+    values = " ".join(f'"{escape_sparql_string(university)}"' for university in universities)
     return f"""
     PREFIX dblp: <https://dblp.org/rdf/schema#>
     PREFIX schema: <https://schema.org/>
-    SELECT ?author ?affiliation
+    SELECT ?university ?author ?affiliation
     WHERE {{
+        VALUES ?university {{ {values} }}
         ?author dblp:primaryAffiliation ?affiliation .
-        FILTER(CONTAINS(LCASE(?affiliation), "{university}"))
+        FILTER(CONTAINS(LCASE(?affiliation), ?university))
     }}
     """
 
 
-def process_university(university, output_dir):
-    """Query and save faculty data for a single university."""
-    university_name = normalize_university_name(university)
-    query = get_faculty_query(university_name)
+def parse_batch_results(results):
+    """Parse the CSV returned by a batch query, or return None if it is not the expected table."""
+    try:
+        df = pd.read_csv(io.StringIO(results), dtype=str, keep_default_na=False)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        print(f"Could not parse SPARQL results: {e}")
+        return None
+
+    missing_columns = {'university', 'author', 'affiliation'} - set(df.columns)
+    if missing_columns:
+        print(f"SPARQL results are missing columns: {', '.join(sorted(missing_columns))}")
+        return None
+    return df
 
-    print(f"Querying faculty for: {university}")
-    results = query_dblp_sparql(query)
 
-    if results:
+def process_university_batch(universities, output_dir):
+    """
+    Query faculty data for a batch of normalized university names and save one CSV per university.
+    Returns (success, from_cache) so callers only rate limit real queries.
+    """
+    query = get_faculty_query(universities)
+
+    # Cache entries that no longer parse fall through to a fresh query
+    results = read_cached_results(query)
+    df = parse_batch_results(results) if results is not None else None
+    from_cache = df is not None
+    if from_cache:
+        print(f"Using cached results for {len(universities)} universities")
+    else:
+        print(f"Querying faculty for {len(universities)} universities")
+        results = query_dblp_sparql(query)
+        df = parse_batch_results(results) if results else None
+        if df is None:
+            print(f"Failed to get results for: {', '.join(universities)}")
+            return False, from_cache
+        write_cached_results(query, results)
+
+    faculty_by_university = dict(tuple(df.groupby('university')))
+    empty = df.iloc[0:0]
+
+    for university in universities:
         # Create safe filename from university name
-        safe_name = "".join(c if c.isalnum() else "_" for c in university_name)
+        safe_name = "".join(c if c.isalnum() else "_" for c in university)
         output_file = output_dir / f"{safe_name}_faculty.csv"
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(results)
-        print(f"Saved results to {output_file}")
-        return True
+        faculty = faculty_by_university.get(university, empty)
+        faculty[['author', 'affiliation']].to_csv(output_file, index=False)
+        print(f"Saved {len(faculty)} faculty to {output_file}")
 
-    print(f"Failed to get results for {university}")
-    return False
+    return True, from_cache
 
 
 def main():
@@ -87,20 +191,29 @@ def main():
         print("Error: 'us-schools' file not found")
         return
 
-    # Process each university with delay between requests
-    delay_between_universities = 2  # seconds
+    # Normalize names, dropping blank lines and duplicates
+    universities = list(dict.fromkeys(
+        normalize_university_name(university) for university in universities if university.strip()
+    ))
+    batches = [
+        universities[i:i + UNIVERSITIES_PER_QUERY]
+        for i in range(0, len(universities), UNIVERSITIES_PER_QUERY)
+    ]
+
+    # Process each batch of universities with delay between requests
+    delay_between_queries = 2  # seconds
 
-    for i, university in enumerate(universities, 1):
-        print(f"\nProcessing university {i}/{len(universities)}")
-        success = process_university(university, output_dir)
+    for i, batch in enumerate(batches, 1):
+        print(f"\nProcessing batch {i}/{len(batches)}")
+        success, from_cache = process_university_batch(batch, output_dir)
 
         if not success:
-            failed_schools.append(university.strip())
+            failed_schools.extend(batch)
 
-        # Only delay if it's not the last university and the query was successful
-        if i < len(universities) and success:
-            print(f"Waiting {delay_between_universities} seconds before next query...")
-            time.sleep(delay_between_universities)
+        # Only delay if it's not the last batch and a query was actually sent
+        if i < len(batches) and success and not from_cache:
+            print(f"Waiting {delay_between_queries} seconds before next query...")
+            time.sleep(delay_between_queries)
 
     # Write failed schools to file
     if failed_schools:
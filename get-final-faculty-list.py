@@ -1,14 +1,89 @@
 import os
 import csv
 import logging
-from bs4 import BeautifulSoup
+import multiprocessing
 import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from html import unescape
+from logging.handlers import QueueHandler, QueueListener
+from lxml import etree
+
+# Precompiled patterns for the fields extracted from DBLP person pages (matched against raw bytes)
+_NAME_RE = re.compile(rb'<span[^>]*class="name primary"[^>]*>([^<]+)</span>')
+_SCHOLAR_RE = re.compile(rb'href="[^"]*scholar\.google\.com[^"]*?user=([^&"\'<>\s]+)')
+_VISIT_LI_RE = re.compile(rb'<li\b[^>]*class="(?:[^"]*\s)?visit(?:\s[^"]*)?"[^>]*>')
+_SHARE_LI_RE = re.compile(rb'<li\b[^>]*class="(?:[^"]*\s)?share(?:\s[^"]*)?"[^>]*>')
+_BULLETS_UL_RE = re.compile(rb'<ul\b[^>]*class="(?:[^"]*\s)?bullets(?:\s[^"]*)?"[^>]*>')
+_LI_TAG_RE = re.compile(rb'<(/?)li\b[^>]*>')
+_LINK_RE = re.compile(rb'<a\b([^>]*)>')
+_FIRST_LINK_TEXT_RE = re.compile(rb'(?:(?!</ul>).)*?<a\b[^>]*>((?:(?!</a>).)*)</a>', re.DOTALL)
+_HREF_ATTR_RE = re.compile(rb'\bhref="([^"]*)"')
+_TAG_RE = re.compile(rb'<[^>]*>')
+
+# Precompiled XPath expressions and patterns for the lxml fallback path
+_NAME_XPATH = etree.XPath('//span[@class="name primary"]')
+_SCHOLAR_HREF_XPATH = etree.XPath('//a[contains(@href, "scholar.google.com")]/@href')
+_VISIT_XPATH = etree.XPath('//li[contains(concat(" ", normalize-space(@class), " "), " visit ")]')
+_SHARE_XPATH = etree.XPath('//li[contains(concat(" ", normalize-space(@class), " "), " share ")]')
+_BULLETS_XPATH = etree.XPath('.//ul[contains(concat(" ", normalize-space(@class), " "), " bullets ")]')
+_LINK_XPATH = etree.XPath('.//a')
+_SCHOLAR_USER_RE = re.compile(r'user=([^&]+)')
+
+# lxml HTML parser, created once per process on first use
+_html_parser = None
+
+# Number of parsed rows buffered before they are written to the output CSV
+WRITE_BATCH_SIZE = 500
+
+# Number of parsed files between progress log messages
+PROGRESS_LOG_INTERVAL = 1000
+
+
+def _decode_match(value):
+    """Decode a captured byte string from a DBLP page and resolve HTML entities."""
+    return unescape(value.decode('utf-8', errors='replace'))
+
+
+def _find_list_item(html_content, li_re):
+    """
+    Return the (start, end) byte span of the first <li> matched by li_re, or None.
+    Nested <li> elements are counted so the span covers the whole item, like a parsed tree would.
+    """
+    li_match = li_re.search(html_content)
+    if not li_match:
+        return None
+
+    depth = 0
+    for tag in _LI_TAG_RE.finditer(html_content, li_match.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return li_match.start(), tag.end()
+    return li_match.start(), len(html_content)
+
+
+def _get_html_parser():
+    """Return this process's lxml HTML parser, creating it on first use."""
+    global _html_parser
+    if _html_parser is None:
+        _html_parser = etree.HTMLParser(recover=True, encoding='utf-8')
+    return _html_parser
+
+
+def _element_text(element):
+    """Return the stripped text content of an lxml element."""
+    return ''.join(element.itertext()).strip()
 
 
 # Set up logging
 def setup_logging(log_dir='logs'):
-    """Configure logging with both file and console handlers."""
+    """
+    Configure logging with both file and console handlers.
+    Records from this process and from the parser worker processes go through a shared
+    queue and are written by a background QueueListener, so parsing never blocks on log I/O.
+    Returns the listener, which must be stopped on exit.
+    """
     os.makedirs(log_dir, exist_ok=True)
 
     # Create a timestamp for the log file
@@ -16,62 +91,102 @@ def setup_logging(log_dir='logs'):
     log_file = os.path.join(log_dir, f'dblp_parser_{timestamp}.log')
 
     # Configure logging format
-    log_format = '%(asctime)s - %(levelname)s - %(message)s'
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.FileHandler(log_file),
+        logging.StreamHandler()
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
 
     # Set up root logger
-    logging.basicConfig(
-        level=logging.INFO,
-        format=log_format,
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
+    log_queue = multiprocessing.Queue(-1)
+    logging.basicConfig(level=logging.INFO, format='%(message)s', handlers=[QueueHandler(log_queue)])
+
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
 
     logging.info('Starting DBLP HTML parser')
+    return listener
+
 
+def init_worker_logging(log_queue):
+    """Send log records from a parser worker process to the main process's logging queue."""
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
 
-def extract_scholar_id(html):
+
+def extract_scholar_id(tree):
     """
-    Try to extract Google Scholar ID from links in the HTML.
+    Try to extract Google Scholar ID from links in the parsed HTML tree.
     Returns None if not found.
     """
     # Look for Google Scholar links which typically contain the ID
-    scholar_links = html.find_all('a', href=re.compile(r'scholar\.google\.com'))
-    for link in scholar_links:
-        href = link.get('href', '')
-        match = re.search(r'user=([^&]+)', href)
+    for href in _SCHOLAR_HREF_XPATH(tree):
+        match = _SCHOLAR_USER_RE.search(href)
         if match:
             return match.group(1)
     return None
 
 
-def extract_homepage(html, filename=None):
+def extract_homepage(tree, filename=None):
     """
-    Try to extract homepage URL from the HTML. Uses the following priority:
+    Try to extract homepage URL from the parsed HTML tree. Uses the following priority:
     1. Homepage link from 'visit' section if available
     2. DBLP persistent URL as fallback
     Returns None if neither is found.
     """
     # First try to get homepage from visit section
-    visit_section = html.find('li', class_='visit')
-    if visit_section:
-        link = visit_section.find('a')
-        if link:
-            homepage = link.get('href')
-            logging.info(f"Found homepage in visit section: {homepage}")
+    visit_sections = _VISIT_XPATH(tree)
+    if visit_sections:
+        links = _LINK_XPATH(visit_sections[0])
+        if links:
+            homepage = links[0].get('href')
+            logging.debug("Found homepage in visit section: %s", homepage)
             return homepage
 
     # If no homepage in visit section, get the DBLP persistent URL
-    share_section = html.find('li', class_='share')
-    if share_section:
+    share_sections = _SHARE_XPATH(tree)
+    if share_sections:
         # The persistent URL is in a bullets list within the share dropdown
-        bullets = share_section.find('ul', class_='bullets')
+        bullets = _BULLETS_XPATH(share_sections[0])
         if bullets:
-            persistent_link = bullets.find('a')
-            if persistent_link:
-                dblp_url = persistent_link.get_text().strip()
-                logging.info(f"Using DBLP URL as homepage: {dblp_url}")
+            persistent_links = _LINK_XPATH(bullets[0])
+            if persistent_links:
+                dblp_url = _element_text(persistent_links[0])
+                logging.debug("Using DBLP URL as homepage: %s", dblp_url)
+                return dblp_url
+
+    logging.warning(f"No homepage or DBLP URL found for {filename}")
+    return None
+
+
+def extract_homepage_fast(html_content, filename=None):
+    """
+    Regex counterpart of extract_homepage that scans the raw HTML bytes instead of a parsed tree.
+    Uses the same priority: 'visit' section first, then the DBLP persistent URL.
+    Returns None if neither is found.
+    """
+    visit_span = _find_list_item(html_content, _VISIT_LI_RE)
+    if visit_span:
+        link_match = _LINK_RE.search(html_content, *visit_span)
+        if link_match:
+            # Like extract_homepage, use the first link in the section even if it has no href
+            href_match = _HREF_ATTR_RE.search(link_match.group(1))
+            homepage = _decode_match(href_match.group(1)) if href_match else None
+            logging.debug("Found homepage in visit section: %s", homepage)
+            return homepage
+
+    share_span = _find_list_item(html_content, _SHARE_LI_RE)
+    if share_span:
+        # The persistent URL is the first link in the first bullets list within the share dropdown
+        bullets_match = _BULLETS_UL_RE.search(html_content, *share_span)
+        if bullets_match:
+            link_match = _FIRST_LINK_TEXT_RE.match(html_content, bullets_match.end(), share_span[1])
+            if link_match:
+                dblp_url = _decode_match(_TAG_RE.sub(b'', link_match.group(1))).strip()
+                logging.debug("Using DBLP URL as homepage: %s", dblp_url)
                 return dblp_url
 
     logging.warning(f"No homepage or DBLP URL found for {filename}")
@@ -80,22 +195,49 @@ def extract_homepage(html, filename=None):
 
 def parse_dblp_html(html_content, filename=None):
     """
-    Parse DBLP HTML content and extract required fields.
+    Parse DBLP HTML content (raw bytes) and extract required fields.
     Returns a dictionary with name, homepage, and scholarid.
     Note: affiliation is handled at the directory level, not from HTML content.
+
+    The fields are pulled out of the raw HTML with precompiled regexes; the page is only
+    parsed into a tree with lxml if the name cannot be found that way.
     """
     logging.debug(f'Parsing HTML content for {filename if filename else "unknown file"}')
-    soup = BeautifulSoup(html_content, 'html.parser')
+
+    name_match = _NAME_RE.search(html_content)
+    if not name_match:
+        return parse_dblp_tree(html_content, filename)
+
+    scholar_match = _SCHOLAR_RE.search(html_content)
+
+    return {
+        'name': _decode_match(name_match.group(1)).strip(),
+        'affiliation': None,  # Will be set based on directory name
+        'homepage': extract_homepage_fast(html_content, filename),
+        'scholarid': _decode_match(scholar_match.group(1)) if scholar_match else None
+    }
+
+
+def parse_dblp_tree(html_content, filename=None):
+    """
+    Fallback for parse_dblp_html that parses the page into a full lxml tree.
+    Returns a dictionary with name, homepage, and scholarid.
+    """
+    logging.debug(f'Falling back to lxml tree parsing for {filename if filename else "unknown file"}')
+    tree = etree.fromstring(html_content, _get_html_parser())
+    if tree is None:  # Empty document
+        logging.warning(f"No HTML content in {filename}")
+        return {'name': None, 'affiliation': None, 'homepage': None, 'scholarid': None}
 
     # Extract name - it's in the h1 tag with class 'name primary'
-    name_elem = soup.find('span', class_='name primary')
-    name = name_elem.get_text().strip() if name_elem else None
+    name_elems = _NAME_XPATH(tree)
+    name = _element_text(name_elems[0]) if name_elems else None
 
     # Extract homepage
-    homepage = extract_homepage(soup)
+    homepage = extract_homepage(tree, filename)
 
     # Extract Google Scholar ID
-    scholar_id = extract_scholar_id(soup)
+    scholar_id = extract_scholar_id(tree)
 
     return {
         'name': name,
@@ -105,54 +247,96 @@ def parse_dblp_html(html_content, filename=None):
     }
 
 
-def process_dblp_files(base_dir, output_file):
+def parse_dblp_file(file_path, university):
+    """
+    Parse a single DBLP HTML file; university is only used in log messages.
+    Returns None if no name was found or the file could not be parsed.
+    Runs inside worker processes, so it must stay a top-level function. The caller
+    sets the affiliation so rows share the main process's university string.
+    """
+    filename = os.path.basename(file_path)
+    try:
+        with open(file_path, 'rb') as htmlfile:
+            html_content = htmlfile.read()
+        result = parse_dblp_html(html_content, filename)
+        if result['name']:  # Only keep rows where we found a name
+            logging.debug("Processed %s from %s: %s", filename, university, result['name'])
+            return result
+        logging.warning(f"No name found in {filename} from {university}")
+    except Exception as e:
+        logging.error(f"Error processing {university}/{filename}: {str(e)}", exc_info=True)
+    return None
+
+
+def process_dblp_files(base_dir, output_file, log_queue=None):
     """
     Process all HTML files in subdirectories of base_dir and write results to output_file.
-    Uses the directory name as the affiliation.
+    Uses the directory name as the affiliation. Files are parsed in parallel across
+    worker processes; rows are written serially from the main process.
+    If log_queue is given, worker processes send their log records to it.
     """
     logging.info(f'Starting to process files from {base_dir}')
     logging.info(f'Output will be written to {output_file}')
     # Ensure output directory exists
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
-    # Write header and process files
-    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['name', 'affiliation', 'homepage', 'scholarid']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-        # Process each university directory
-        for univ_dir in os.listdir(base_dir):
-            univ_path = os.path.join(base_dir, univ_dir)
-            if not os.path.isdir(univ_path):
+    # Collect (file_path, university) pairs for every HTML file
+    file_paths = []
+    universities = []
+    with os.scandir(base_dir) as univ_entries:
+        for univ_entry in univ_entries:
+            if not univ_entry.is_dir():
                 continue
 
             # Convert directory name to university name (e.g., "harvard" -> "Harvard University")
-            university = " ".join(word.capitalize() for word in univ_dir.split('_'))
+            university = " ".join(word.capitalize() for word in univ_entry.name.split('_'))
             if not university.lower().endswith(('university', 'institute', 'college')):
                 university += " University"
+            affiliation = sys.intern(university)
+
+            with os.scandir(univ_entry.path) as file_entries:
+                for file_entry in file_entries:
+                    if file_entry.name.endswith('.html') and file_entry.is_file():
+                        file_paths.append(file_entry.path)
+                        universities.append(affiliation)
+
+    logging.info(f'Found {len(file_paths)} HTML files to process')
+
+    # Write header and parsed rows
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        fieldnames = ['name', 'affiliation', 'homepage', 'scholarid']
+        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+        writer.writeheader()
 
-            # Process each HTML file in the university directory
-            for filename in os.listdir(univ_path):
-                if filename.endswith('.html'):
-                    file_path = os.path.join(univ_path, filename)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as htmlfile:
-                            html_content = htmlfile.read()
-                            result = parse_dblp_html(html_content, filename)
-                            if result['name']:  # Only write if we found a name
-                                result['affiliation'] = university
-                                writer.writerow(result)
-                                logging.info(f"Processed {filename} from {university}: {result['name']}")
-                            else:
-                                logging.warning(f"No name found in {filename} from {university}")
-                    except Exception as e:
-                        logging.error(f"Error processing {university}/{filename}: {str(e)}", exc_info=True)
+        buffer = []
+        processed = 0
+        named = 0
+        if log_queue is not None:
+            executor = ProcessPoolExecutor(initializer=init_worker_logging, initargs=(log_queue,))
+        else:
+            executor = ProcessPoolExecutor()
+
+        with executor:
+            results = executor.map(parse_dblp_file, file_paths, universities, chunksize=32)
+            for affiliation, result in zip(universities, results):
+                processed += 1
+                if result:
+                    named += 1
+                    result['affiliation'] = affiliation
+                    buffer.append(result)
+                    if len(buffer) >= WRITE_BATCH_SIZE:
+                        writer.writerows(buffer)
+                        buffer.clear()
+                if processed % PROGRESS_LOG_INTERVAL == 0:
+                    logging.info(f'Processed {processed} files, {named} named')
+        writer.writerows(buffer)
+
+    logging.info(f'Finished processing {processed} files, {named} named')
 
 
 def main():
     # Set up logging
-    setup_logging()
+    listener = setup_logging()
 
     try:
         base_directory = "faculty_html"  # Base directory containing university subdirectories
@@ -164,13 +348,15 @@ def main():
         logging.info(f"Output file: {output_csv}")
 
         # Process files
-        process_dblp_files(base_directory, output_csv)
+        process_dblp_files(base_directory, output_csv, listener.queue)
 
         # Log completion
         logging.info("Script completed successfully")
     except Exception as e:
         logging.error("Script failed with error", exc_info=True)
         raise
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,54 @@
+"""
+Check that the regex fast path in get-final-faculty-list.py extracts the same fields as the
+lxml tree fallback. The fixture follows the markup of a dblp.org person page (headline,
+visit/share/export drop-downs, publication list).
+"""
+import importlib.util
+import re
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURE = ROOT / 'tests' / 'fixtures' / 'dblp_person_page.html'
+
+_spec = importlib.util.spec_from_file_location('final_faculty_list', ROOT / 'get-final-faculty-list.py')
+final_faculty_list = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(final_faculty_list)
+
+
+def _without_visit_section(html_content):
+    """Drop the visit drop-down so the homepage comes from the share section."""
+    return re.sub(rb'<li class="drop-down visit">.*?</ul></div></li>\n', b'', html_content, flags=re.DOTALL)
+
+
+def _without_scholar_link(html_content):
+    return re.sub(rb'<li><a href="https://scholar\.google\.com[^\n]*\n', b'', html_content)
+
+
+PAGE = FIXTURE.read_bytes()
+
+
+@pytest.mark.parametrize('html_content, expected', [
+    (PAGE, {
+        'name': 'Jane Q. Doë',
+        'homepage': 'https://cs.example.edu/~jdoe/',
+        'scholarid': 'AbCdEf12345',
+    }),
+    (_without_visit_section(PAGE), {
+        'name': 'Jane Q. Doë',
+        'homepage': 'https://dblp.org/pid/12/3456',
+        'scholarid': None,
+    }),
+    (_without_scholar_link(PAGE), {
+        'name': 'Jane Q. Doë',
+        'homepage': 'https://cs.example.edu/~jdoe/',
+        'scholarid': None,
+    }),
+])
+def test_regex_path_matches_tree_path(html_content, expected):
+    fast = final_faculty_list.parse_dblp_html(html_content, 'dblp_person_page.html')
+    tree = final_faculty_list.parse_dblp_tree(html_content, 'dblp_person_page.html')
+
+    assert fast == tree
+    assert {key: fast[key] for key in expected} == expected